@@ -2,19 +2,22 @@
 import sys
 import tkinter as tk
 from tkinter import ttk, messagebox
-import threading
-import time
-from typing import Dict, Tuple
-import speedtest
+from concurrent.futures import ThreadPoolExecutor
 import logging
 from pathlib import Path
+from speedtest_servers import (
+    SERVER_CACHE_TTL,
+    fetch_servers,
+    load_cached_servers,
+    server_cache_age,
+)
 
 
 class SpeedTestGUI:
     def __init__(self, root):
         self.root = root
         self.root.title("SpeedTest Monitor Configuration")
-        self.root.geometry("500x400")
+        self.root.geometry("500x560")
 
         # Set up logging
         self.setup_logging()
@@ -25,6 +28,8 @@ class SpeedTestGUI:
         self.interval_var = tk.StringVar(value="10")  # Default 10 minutes
         self.search_var = tk.StringVar()
         self.country_var = tk.StringVar()
+        self.status_var = tk.StringVar()
+        self._status_after_id = None
 
         # Output format variables
         self.output_format_vars = {
@@ -35,10 +40,32 @@ class SpeedTestGUI:
         # Server loading state
         self.servers_dict = {}
         self.all_servers = []
+        self._all_ids = []
+        self._server_names_lower = []
+        self._by_country = {}
+        self._display_ids = []
+        self._current_values = ()
+        self._last_values = ()
+        self._last_marker = None
+        self.max_listed = 200
+        self.max_matches = 500
         self.loading = False
         self.retry_count = 0
         self.max_retries = 3
 
+        # Speedtest client and loader thread reused across retries and refreshes
+        self._st = None
+        self._loader_executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="loader"
+        )
+
+        # Search debouncing state
+        self.filter_delay_ms = 150
+        self._filter_after_id = None
+        self._last_query = None
+        self._last_hits = []
+        self._last_truncated = False
+
         self.create_widgets()
         self.load_servers()
 
@@ -82,16 +109,23 @@ class SpeedTestGUI:
         self.search_var = tk.StringVar()
         self.search_entry = ttk.Entry(server_frame, textvariable=self.search_var)
         self.search_entry.grid(row=1, column=1, sticky=(tk.W, tk.E))
-        self.search_entry.bind("<KeyRelease>", self.filter_servers)
+        self.search_entry.bind("<KeyRelease>", self.schedule_filter)
 
         # Server selection
         ttk.Label(server_frame, text="Select Server:").grid(
             row=2, column=0, sticky=tk.W
         )
-        self.server_dropdown = ttk.Combobox(
-            server_frame, textvariable=self.server_var, state="readonly"
+        list_frame = ttk.Frame(server_frame)
+        list_frame.grid(row=2, column=1, sticky=(tk.W, tk.E))
+        list_frame.columnconfigure(0, weight=1)
+        self.server_list = tk.Listbox(list_frame, height=10, exportselection=False)
+        self.server_list.grid(row=0, column=0, sticky=(tk.W, tk.E))
+        scrollbar = ttk.Scrollbar(
+            list_frame, orient=tk.VERTICAL, command=self.server_list.yview
         )
-        self.server_dropdown.grid(row=2, column=1, sticky=(tk.W, tk.E))
+        scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
+        self.server_list.configure(yscrollcommand=scrollbar.set)
+        self.server_list.bind("<<ListboxSelect>>", self.on_server_select)
 
         # Country filter
         ttk.Label(server_frame, text="Filter by Country:").grid(
@@ -102,7 +136,7 @@ class SpeedTestGUI:
             server_frame, textvariable=self.country_var, state="readonly"
         )
         self.country_dropdown.grid(row=3, column=1, sticky=(tk.W, tk.E))
-        self.country_dropdown.bind("<<ComboboxSelected>>", self.filter_by_country)
+        self.country_dropdown.bind("<<ComboboxSelected>>", self.apply_filters)
 
         # Manual server entry
         ttk.Label(main_frame, text="Or Enter Server ID:").grid(
@@ -138,108 +172,288 @@ class SpeedTestGUI:
         self.start_button.grid(row=7, column=0, columnspan=2, pady=20)
 
         # Progress indicator
-        self.progress = ttk.Progressbar(main_frame, mode="indeterminate")
+        self.progress = ttk.Progressbar(main_frame, mode="determinate", value=0)
         self.progress.grid(row=8, column=0, columnspan=2, sticky=(tk.W, tk.E))
 
-    def filter_servers(self, event=None):
-        """Filter servers based on search text"""
-        search_text = self.search_var.get().lower()
-        if not hasattr(self, "all_servers"):
-            self.all_servers = list(self.servers_dict.keys())
+        # Status line
+        ttk.Label(main_frame, textvariable=self.status_var).grid(
+            row=9, column=0, columnspan=2, sticky=tk.W
+        )
 
-        filtered_servers = [
-            server for server in self.all_servers if search_text in server.lower()
-        ]
+    def set_status(self, message, clear_after_ms=5000):
+        """Show a non-blocking status message that clears itself"""
+        if self._status_after_id is not None:
+            self.root.after_cancel(self._status_after_id)
+        self.status_var.set(message)
+        self._status_after_id = self.root.after(
+            clear_after_ms, lambda: self.status_var.set("")
+        )
 
-        self.server_dropdown["values"] = filtered_servers
-        if filtered_servers:
-            self.server_var.set(filtered_servers[0])
+    def show_servers(self, names, ids, truncated=False):
+        """Show servers in the list, keeping their ids aligned by index"""
+        values = tuple(names)
+        self._current_values = values
+        self._display_ids = ids
+        if values and self.server_var.get() not in values:
+            self.server_var.set(values[0])
+
+        # Only the first max_listed matches are handed to Tk, so the cost of
+        # a keystroke does not depend on the total number of servers
+        shown = values[: self.max_listed]
+        marker = None
+        if truncated or len(values) > len(shown):
+            more = f"{len(values) - len(shown)}{'+' if truncated else ''}"
+            marker = f"(+{more} more, refine search)"
+        if shown != self._last_values or marker != self._last_marker:
+            self.server_list.delete(0, tk.END)
+            self.server_list.insert(tk.END, *shown)
+            if marker is not None:
+                self.server_list.insert(tk.END, marker)
+            self._last_values = shown
+            self._last_marker = marker
+
+        # Highlight the selected server if it is listed
+        self.server_list.selection_clear(0, tk.END)
+        try:
+            idx = shown.index(self.server_var.get())
+        except ValueError:
+            return
+        self.server_list.selection_set(idx)
+        self.server_list.see(idx)
+
+    def on_server_select(self, event=None):
+        """Track the server picked in the list"""
+        selection = self.server_list.curselection()
+        if not selection:
+            return
+        idx = selection[0]
+        if idx < len(self._last_values):
+            self.server_var.set(self._last_values[idx])
+        else:
+            # The "more results" marker is not a server
+            self.server_list.selection_clear(idx)
+
+    def schedule_filter(self, event=None):
+        """Debounce search keystrokes into a single filter pass"""
+        if self._filter_after_id is not None:
+            self.root.after_cancel(self._filter_after_id)
+        self._filter_after_id = self.root.after(
+            self.filter_delay_ms, self.apply_filters
+        )
 
-    def filter_by_country(self, event=None):
-        """Filter servers by selected country"""
+    def apply_filters(self, event=None):
+        """Filter servers by search text and country in a single pass"""
+        if self._filter_after_id is not None:
+            self.root.after_cancel(self._filter_after_id)
+            self._filter_after_id = None
+        search_text = self.search_var.get().casefold()
         selected_country = self.country_var.get()
-
         if selected_country == "All Countries":
-            self.server_dropdown["values"] = self.all_servers
+            selected_country = ""
+        query = (search_text, selected_country)
+        if query == self._last_query:
+            return
+
+        # Typing more characters can only narrow the previous result, so only
+        # those servers need to be checked again, unless that result was cut
+        # short. A selected country limits the scan to its own rows.
+        last = self._last_query
+        if (
+            last is not None
+            and not self._last_truncated
+            and last[1] == selected_country
+            and search_text.startswith(last[0])
+        ):
+            candidates = self._last_hits
+        elif selected_country:
+            candidates = self._by_country.get(selected_country, [])
         else:
-            filtered_servers = [
-                server
-                for server in self.all_servers
-                if f"({selected_country})" in server
-            ]
-            self.server_dropdown["values"] = filtered_servers
-
-        if self.server_dropdown["values"]:
-            self.server_var.set(self.server_dropdown["values"][0])
+            candidates = range(len(self._server_names_lower))
+
+        # Stop once max_matches are found so a broad query costs the same as
+        # a narrow one; only max_listed of them are shown anyway
+        names_lower = self._server_names_lower
+        hits, truncated = [], False
+        for i in candidates:
+            if search_text in names_lower[i]:
+                if len(hits) == self.max_matches:
+                    truncated = True
+                    break
+                hits.append(i)
+        self._last_query = query
+        self._last_hits = hits
+        self._last_truncated = truncated
+
+        self.show_servers(
+            [self.all_servers[i] for i in hits],
+            [self._all_ids[i] for i in hits],
+            truncated,
+        )
 
     def refresh_servers(self):
         """Manually refresh the server list"""
         if not self.loading:
             self.retry_count = 0
             self.refresh_button.config(state="disabled")
-            self.load_servers()
+            # Keep the cached list until the download succeeds; fetch_servers()
+            # then replaces it atomically
+            self.load_servers(force=True)
             self.root.after(2000, lambda: self.refresh_button.config(state="normal"))
 
-    def load_servers(self):
-        """Load available speedtest servers"""
+    def build_server_index(self, servers):
+        """Build display names, ids and the country index without touching Tk"""
+        # Create a dictionary of server ids to server info and collect the
+        # display names in the same pass over the distance groups
+        servers_dict, entries = {}, []
+        for group in servers.values():
+            for server in group:
+                server_id = int(server["id"])
+                if server_id in servers_dict:
+                    continue
+                servers_dict[server_id] = server
+                name = f"{server['name']} ({server['country']})"
+                entries.append((name.casefold(), name, server_id))
+
+        # One case-insensitive sort; the casefolded key doubles as search text
+        entries.sort(key=lambda entry: entry[0])
+
+        # Store all display names and their ids for filtering; servers that
+        # share a name and country get their id appended to stay distinct
+        all_servers, all_ids, names_lower = [], [], []
+        by_country = {}
+        seen = set()
+        for lower, name, server_id in entries:
+            if name in seen:
+                name = f"{name} [{server_id}]"
+                lower = name.casefold()
+            seen.add(name)
+            all_servers.append(name)
+            all_ids.append(server_id)
+            names_lower.append(lower)
+
+            # Index the rows by the server's country field rather than parsing
+            # it back out of the display name, so the country filter is a
+            # single lookup
+            country = servers_dict[server_id]["country"]
+            by_country.setdefault(country, []).append(len(all_servers) - 1)
+
+        return servers_dict, all_servers, all_ids, names_lower, by_country
+
+    def apply_server_index(self, index):
+        """Swap in a server index and update the dropdowns; Tk thread only"""
+        # Remember the picked server by id, since its display name can change
+        try:
+            idx = self._current_values.index(self.server_var.get())
+            selected_id = self._display_ids[idx]
+        except (ValueError, IndexError):
+            selected_id = None
+
+        (
+            self.servers_dict,
+            self.all_servers,
+            self._all_ids,
+            self._server_names_lower,
+            self._by_country,
+        ) = index
+
+        # Extract unique countries for country filter
+        countries = sorted(self._by_country)
+        country_options = ["All Countries"] + countries
+        self.country_dropdown["values"] = country_options
+        if self.country_var.get() not in self._by_country:
+            self.country_var.set("All Countries")
+
+        # Update server list, keeping any search text already typed and the
+        # picked server if it is still listed; otherwise the first row is used
+        selected = ""
+        if selected_id is not None and selected_id in self.servers_dict:
+            selected = self.all_servers[self._all_ids.index(selected_id)]
+        self._last_query = None
+        self.server_var.set(selected)
+        self.apply_filters()
+
+    def populate_servers(self, servers):
+        """Fill the server and country dropdowns from a get_servers() result"""
+        self.apply_server_index(self.build_server_index(servers))
+
+    def start_progress(self):
+        """Animate the progress bar while a load is in flight"""
+        self.progress.configure(mode="indeterminate")
+        self.progress.start()
+
+    def stop_progress(self):
+        """Stop the progress bar animation and leave it idle"""
+        self.progress.stop()
+        self.progress.configure(mode="determinate", value=0)
+
+    def load_servers(self, force=False):
+        """Load available speedtest servers, serving the on-disk cache first"""
+        # Show the cached list instantly, even if it is stale, unless a
+        # download was explicitly requested
+        age = server_cache_age() if not force else None
+        cached = load_cached_servers(max_age=None) if age is not None else None
+        if cached:
+            self.populate_servers(cached)
+            if age <= SERVER_CACHE_TTL:
+                logging.info("Loaded %d servers from cache", len(self.all_servers))
+                self.set_status(f"Loaded {len(self.all_servers)} servers from cache")
+                return
 
         def _load():
+            # Runs on a worker thread: no Tk calls except root.after
             try:
-                self.loading = True
-                self.progress.start()
-                st = speedtest.Speedtest()
-                servers = st.get_servers()
-
-                # Create a dictionary of server names to server info
-                self.servers_dict = {
-                    f"{server['name']} ({server['country']})": server
-                    for server_list in servers.values()
-                    for server in server_list
-                }
-
-                # Store all servers for filtering
-                self.all_servers = sorted(self.servers_dict.keys())
-
-                # Update server dropdown
-                self.server_var.set(self.all_servers[0] if self.all_servers else "")
-                self.server_dropdown["values"] = self.all_servers
-
-                # Extract unique countries for country filter
-                countries = sorted(
-                    set(
-                        server["country"]
-                        for server_list in servers.values()
-                        for server in server_list
-                    )
-                )
-                country_options = ["All Countries"] + countries
-                self.country_dropdown["values"] = country_options
-                self.country_var.set("All Countries")
-
-                logging.info(f"Successfully loaded {len(self.all_servers)} servers")
-                messagebox.showinfo(
-                    "Server List Updated",
-                    f"Successfully loaded {len(self.all_servers)} servers",
-                )
+                # Keep the client, and with it the downloaded config, so a
+                # retry or refresh only repeats the server list request
+                if self._st is None:
+                    import speedtest
 
+                    self._st = speedtest.Speedtest()
+                index = self.build_server_index(fetch_servers(self._st))
             except Exception as e:
-                if self.retry_count < self.max_retries:
-                    self.retry_count += 1
-                    logging.warning(
-                        f"Retry {self.retry_count}: Failed to load servers - {str(e)}"
-                    )
-                    self.root.after(5000, _load)  # Retry after 5 seconds
-                else:
-                    logging.error(
-                        f"Failed to load servers after {self.max_retries} attempts: {str(e)}"
-                    )
-                    self.show_error(f"Failed to load server list: {str(e)}")
+                self.root.after(0, _failed, e)
+            else:
+                self.root.after(0, _done, index)
+
+        def _done(index):
+            try:
+                self.apply_server_index(index)
             finally:
                 self.loading = False
-                self.progress.stop()
+                self.stop_progress()
+
+            logging.info("Successfully loaded %d servers", len(self.all_servers))
+            self.set_status(f"Loaded {len(self.all_servers)} servers")
+
+        def _failed(e):
+            if self.retry_count < self.max_retries:
+                self.retry_count += 1
+                logging.warning(
+                    "Retry %d: Failed to load servers - %s", self.retry_count, e
+                )
+                # Retry after 5 seconds on a fresh worker
+                self.root.after(5000, _start)
+            else:
+                self.loading = False
+                self.stop_progress()
+                logging.error(
+                    "Failed to load servers after %d attempts: %s",
+                    self.max_retries,
+                    e,
+                )
+                self.show_error(f"Failed to load server list: {str(e)}")
+
+        def _start():
+            self._loader_executor.submit(_load)
 
         # Start loading in a separate thread
-        threading.Thread(target=_load, daemon=True).start()
+        self.loading = True
+        self.start_progress()
+        try:
+            _start()
+        except Exception:
+            self.loading = False
+            self.stop_progress()
+            raise
 
     def start_monitor(self):
         """Start the speed test monitor with selected output formats"""
@@ -265,16 +479,27 @@ class SpeedTestGUI:
                     )
                     return
             else:
-                selected_server = self.server_var.get()
-                if selected_server in self.servers_dict:
-                    server_id = self.servers_dict[selected_server]["id"]
+                try:
+                    idx = self._current_values.index(self.server_var.get())
+                except ValueError:
+                    idx = -1
+                if idx >= 0:
+                    server_id = self._display_ids[idx]
                 else:
                     messagebox.showerror(
                         "Error", "Please select a server or enter a manual server ID."
                     )
                     return
 
-            interval = int(self.interval_var.get())
+            try:
+                interval = int(self.interval_var.get())
+                if interval <= 0:
+                    raise ValueError
+            except ValueError:
+                messagebox.showerror(
+                    "Error", "Invalid test interval. Please enter a positive number."
+                )
+                return
 
             # Hide the configuration window
             self.root.withdraw()
@@ -290,7 +515,7 @@ class SpeedTestGUI:
                 )
                 monitor.start()
             except Exception as e:
-                logging.error(f"Error in monitor: {str(e)}")
+                logging.error("Error in monitor: %s", e)
                 raise
             finally:
                 # Show the configuration window again when monitor closes
@@ -298,7 +523,7 @@ class SpeedTestGUI:
 
         except Exception as e:
             self.show_error(f"Error starting monitor: {str(e)}")
-            logging.error(f"Error in start_monitor: {str(e)}")
+            logging.error("Error in start_monitor: %s", e)
             self.root.deiconify()
 
     def show_error(self, message):
@@ -310,6 +535,7 @@ def main():
     root = tk.Tk()
     app = SpeedTestGUI(root)
     root.mainloop()
+    app._loader_executor.shutdown(wait=False, cancel_futures=True)
 
 
 if __name__ == "__main__":
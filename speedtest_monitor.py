@@ -1,57 +1,157 @@
 import speedtest
-import schedule
+import os
 import time
 import csv
 import json
 from datetime import datetime
 import logging
+import logging.handlers
 import sys
-from typing import Optional, Dict, List
-import matplotlib.pyplot as plt
-from matplotlib.animation import FuncAnimation
-import pandas as pd
-from collections import deque
+from typing import Optional, Dict, List, Tuple
+import numpy as np
 import threading
+import queue
+from concurrent.futures import Future
+from collections import deque
 from pathlib import Path
+from speedtest_servers import (
+    closest_servers, get_servers, index_servers, is_reachable, probe_servers
+)
 
 class SpeedTestMonitor:
     def __init__(self, server_id: Optional[int] = None, interval_minutes: int = 10, 
-                 output_formats: List[str] = ['csv', 'json']):
+                 output_formats: List[str] = ['csv', 'json'], enable_plot: bool = True):
+        if interval_minutes <= 0:
+            raise ValueError(f"Test interval must be positive, got {interval_minutes} minutes")
+        
         # Create logs directory if it doesn't exist
         Path('logs').mkdir(exist_ok=True)
         
-        # Set up logging
+        # Set up logging; file writes are batched and flushed immediately
+        # only for errors, and the log is capped at a few rotated files
+        log_format = '%(asctime)s - %(levelname)s - %(message)s'
+        self._log_file = logging.handlers.RotatingFileHandler(
+            'logs/speedtest.log', maxBytes=1024 * 1024, backupCount=3, delay=True
+        )
+        self._log_file.setFormatter(logging.Formatter(log_format))
+        self._log_buffer = logging.handlers.MemoryHandler(
+            capacity=64, flushLevel=logging.ERROR, target=self._log_file
+        )
         logging.basicConfig(
             level=logging.INFO,
-            format='%(asctime)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler('logs/speedtest.log'),
-                logging.StreamHandler(sys.stdout)
-            ]
+            format=log_format,
+            handlers=[logging.StreamHandler(sys.stdout)]
         )
+        # Attached explicitly: basicConfig() does nothing when the GUI has
+        # already configured the root logger
+        root_logger = logging.getLogger()
+        if self._log_buffer not in root_logger.handlers:
+            root_logger.addHandler(self._log_buffer)
         
         self.server_id = server_id
         self.interval_minutes = interval_minutes
-        self.running = True
+        self.enable_plot = enable_plot
         self.output_formats = [fmt.lower() for fmt in output_formats]
         
         # File paths
         self.data_dir = Path('data')
         self.data_dir.mkdir(exist_ok=True)
         self.csv_file = self.data_dir / 'speed_test_results.csv'
-        self.json_file = self.data_dir / 'speed_test_results.json'
+        self.json_file = self.data_dir / 'speed_test_results.jsonl'
+        self.best_server_file = self.data_dir / 'best_server.json'
+        self.state_file = self.data_dir / 'state.json'  # last MAX_POINTS samples
         
         # Initialize data structures
         self.MAX_POINTS = 50
-        self.timestamps = deque(maxlen=self.MAX_POINTS)
-        self.download_speeds = deque(maxlen=self.MAX_POINTS)
-        self.upload_speeds = deque(maxlen=self.MAX_POINTS)
-        self.pings = deque(maxlen=self.MAX_POINTS)
+        self.Y_HEADROOM = 1.1  # top of the y axis relative to the data maximum
+        self.Y_SLACK = 0.3  # shrink the y axis once it is this much too tall
+        
+        # One ring buffer of samples (epoch seconds, Mbps, Mbps, ms, HH:MM tick
+        # label); self._n counts samples ever added
+        self._buf = np.zeros(self.MAX_POINTS, dtype=[
+            ('ts', 'f8'), ('dl', 'f4'), ('ul', 'f4'), ('ping', 'f4'), ('label', 'U5')
+        ])
+        self._plot_labels = self._buf['label'][:0]
+        self._data_lock = threading.Lock()
+        self._xs = np.arange(self.MAX_POINTS, dtype=np.float32)
+        self._n = 0
+        self._plotted_n = 0  # value of self._n when the lines were last updated
+        
+        # Monotonic queues of (sample number, value) holding the window maxima
+        # for the y limits, largest first
+        self._maxima = {field: deque() for field in ('dl', 'ul', 'ping')}
+        
+        # Set by the test thread, consumed by the GUI-thread redraw timer, which
+        # only needs to be quick enough for a test result to appear promptly
+        self.REDRAW_POLL_MS = 2000
+        self._new_data = threading.Event()
+        self._first_test_done = threading.Event()
+        self._redraw_timer = None
         
         # Ensure output directories exist
         self.initialize_output_files()
         
-        # Set up plotting
+        # Keep the output files open for the lifetime of the monitor
+        self._csv_fh = None
+        if 'csv' in self.output_formats:
+            self._csv_fh = open(self.csv_file, 'a', newline='', buffering=1024 * 1024)
+        self._json_fh = None
+        if 'json' in self.output_formats:
+            self._json_fh = open(self.json_file, 'a', buffering=64 * 1024)
+        
+        # Results are written by a single writer thread so tests never wait on disk
+        self.WRITE_BATCH_MAX = 128
+        self._write_q = queue.Queue()
+        self._writer_thread = threading.Thread(target=self._writer_loop, daemon=True)
+        self._writer_thread.start()
+        
+        # Rows are plain scalars, so format them directly instead of via csv.writer
+        self._row_fmt = '{ts},{dl:.2f},{ul:.2f},{ping:.1f},{host},{name},{country},{sponsor}\n'
+        self._csv_escape = str.maketrans({',': ' ', '"': "'", '\n': ' ', '\r': ' '})
+        
+        # Set up plotting only when it is wanted, so headless runs never
+        # import matplotlib
+        self.fig = None
+        if self.enable_plot:
+            self._setup_plot()
+        
+        # Load existing data
+        self.load_existing_data()
+        
+        # Speed tests run one at a time on a daemon worker thread, so closing
+        # the window mid-test does not keep the process alive
+        self._stop = threading.Event()
+        self._work_q = queue.Queue()
+        self._worker_thread = threading.Thread(target=self._worker_loop, name='speedtest',
+                                               daemon=True)
+        self._worker_thread.start()
+        
+        # Fetch the speedtest.net config for the first test while the plot starts up
+        self._st_future = self._run_in_worker(speedtest.Speedtest)
+        
+        # Client and server are reused across tests and re-probed periodically
+        self.REPROBE_EVERY = 24  # samples
+        self.CLIENT_REFRESH = 6 * 60 * 60  # seconds before the config is fetched again
+        self.BEST_SERVER_TTL = 6 * 60 * 60  # seconds a persisted choice stays valid
+        self.LATENCY_SPIKE = 2.0  # re-probe once latency exceeds this factor
+        self._best_latency = None
+        self._st = None
+        self._st_refreshed = None
+        self._server = None
+        self._tests_since_probe = 0
+        self._st_lock = threading.Lock()
+        
+        # The scheduler thread sleeps until the next test is due, or until
+        # stop() sets _stop
+        self._scheduler_thread = None
+        self._test_future = None
+        self._submit_lock = threading.Lock()
+
+    def _setup_plot(self):
+        """Create the figure, lines and axes formatting"""
+        import matplotlib.pyplot as plt
+        from matplotlib.ticker import FuncFormatter, MaxNLocator
+        
         plt.style.use('dark_background')
         self.fig, (self.ax1, self.ax2) = plt.subplots(2, 1, figsize=(12, 8))
         self.fig.suptitle('Real-time Internet Speed Test Results')
@@ -69,12 +169,16 @@ class SpeedTestMonitor:
         self.ax2.grid(True, alpha=0.3)
         self.ax2.legend()
         
-        # Load existing data
-        self.load_existing_data()
+        # Label only the visible ticks, and only when the figure is drawn
+        self.ax2.xaxis.set_major_locator(MaxNLocator(integer=True, nbins=8))
+        self.ax2.xaxis.set_major_formatter(FuncFormatter(self._format_time_tick))
+        self.ax2.tick_params(axis='x', labelrotation=45)
         
-        # Create scheduler thread
-        self.scheduler_thread = threading.Thread(target=self.run_scheduler)
-        self.scheduler_thread.daemon = True
+        # Shown until the first speed test of this session has finished
+        self._measuring_text = self.ax1.text(
+            0.5, 0.5, 'Measuring…', transform=self.ax1.transAxes,
+            ha='center', va='center', fontsize=14, alpha=0.7
+        )
 
     def initialize_output_files(self):
         """Initialize output files and directories"""
@@ -93,223 +197,549 @@ class SpeedTestMonitor:
                         'Server Country',
                         'Server Sponsor'
                     ])
-            
-            # Initialize JSON file
-            if 'json' in self.output_formats and not self.json_file.exists():
-                with open(self.json_file, 'w') as f:
-                    json.dump({'speed_tests': []}, f, indent=2)
                     
         except Exception as e:
-            logging.error(f"Error initializing output files: {str(e)}")
+            logging.error("Error initializing output files: %s", e)
             raise
 
     def run_speed_test(self):
-        """Run a single speed test"""
+        """Run a single speed test and return its results, or None on failure"""
         try:
-            logging.info(f"Running scheduled test (Every {self.interval_minutes} minutes)")
-            st = speedtest.Speedtest()
-            
-            # Get servers list first
-            servers = st.get_servers()
-            
-            if self.server_id:
-                # Filter for specific server if ID provided
-                server = next((s for s in servers for sl in servers.values() 
-                             for s in sl if s['id'] == self.server_id), None)
-                if not server:
-                    raise ValueError(f"Server with ID {self.server_id} not found")
-            else:
-                # Get best server if no specific ID
-                server = st.get_best_server()
-                
-            logging.info(f"Using server: {server['host']} ({server['name']}, {server['country']}) - {server['sponsor']}")
+            logging.info("Running scheduled test (Every %s minutes)", self.interval_minutes)
+            with self._st_lock:
+                try:
+                    st, server = self._get_client()
+                    
+                    logging.info("Using server: %s (%s, %s) - %s", server['host'], server['name'],
+                                 server['country'], server['sponsor'])
+                    
+                    # Run tests; results are rounded once here for every output
+                    download_speed = round(st.download() / 1_000_000, 2)  # Convert to Mbps
+                    upload_speed = round(st.upload() / 1_000_000, 2)    # Convert to Mbps
+                    
+                    # speedtest-cli swallows transfer errors, so a dead server
+                    # shows up as no throughput rather than an exception
+                    if not download_speed or not upload_speed:
+                        raise RuntimeError(f"No data transferred with {server['host']}")
+                except Exception:
+                    # Start from a fresh client and server next time, and do
+                    # not let a restart reuse this server either
+                    self._st = None
+                    self._server = None
+                    if self.server_id is None:
+                        self._forget_best_server()
+                    raise
+                ping = round(st.results.ping, 1)
+                self._tests_since_probe += 1
             
-            # Run tests
-            download_speed = st.download() / 1_000_000  # Convert to Mbps
-            upload_speed = st.upload() / 1_000_000    # Convert to Mbps
-            ping = st.results.ping
+            return datetime.now(), download_speed, upload_speed, ping, server
             
-            current_time = datetime.now()
-            timestamp = current_time.strftime("%Y-%m-%d %H:%M")
+        except Exception as e:
+            logging.error("Error running speed test: %s", e)
+            return None
+
+    def _on_test_done(self, future):
+        """Record the results of a finished speed test"""
+        try:
+            result = future.result()
+            if result is None:
+                return
+            if self._stop.is_set():
+                # The writer has already closed the files
+                logging.warning("Monitor stopped before the speed test finished, result discarded")
+                return
+            current_time, download_speed, upload_speed, ping, server = result
             
             # Update data structures
-            self.timestamps.append(current_time)
-            self.download_speeds.append(download_speed)
-            self.upload_speeds.append(upload_speed)
-            self.pings.append(ping)
-            
-            # Prepare data dictionary
-            data = {
-                'timestamp': timestamp,
-                'download_speed': download_speed,
-                'upload_speed': upload_speed,
-                'ping': ping,
-                'server_host': server['host'],
-                'server_name': server['name'],
-                'server_country': server['country'],
-                'server_sponsor': server['sponsor']
-            }
+            self.add_sample(current_time, download_speed, upload_speed, ping)
             
             # Save results
-            self.save_results(data)
+            self._persist(current_time, download_speed, upload_speed, ping, server)
             
-            logging.info(f"Speed test completed - Down: {download_speed:.2f} Mbps, Up: {upload_speed:.2f} Mbps, Ping: {ping:.1f} ms")
-            return True
+            logging.info("Speed test completed - Down: %.2f Mbps, Up: %.2f Mbps, Ping: %.1f ms",
+                         download_speed, upload_speed, ping)
             
         except Exception as e:
-            logging.error(f"Error running speed test: {str(e)}")
-            return False
+            logging.error("Error recording speed test results: %s", e)
+
+    def _get_client(self):
+        """Return the shared Speedtest client and its server, re-probing when due"""
+        if self._st is None or time.monotonic() - self._st_refreshed > self.CLIENT_REFRESH:
+            # The chosen server stays valid for the new client
+            self._st = self._next_speedtest()
+            self._st_refreshed = time.monotonic()
+        
+        if self._server is None or self._tests_since_probe >= self.REPROBE_EVERY:
+            servers = get_servers(self._st)
+            if self.server_id is not None:
+                # Filter for specific server if ID provided
+                server = index_servers(servers).get(int(self.server_id))
+                if not server:
+                    raise ValueError(f"Server with ID {self.server_id} not found")
+                self._server = self._st.get_best_server([server])
+            else:
+                # After a restart, reuse the server chosen by an earlier run
+                use_cache = self._server is None
+                self._server = self._choose_server(servers, use_cache)
+            self._tests_since_probe = 0
+        else:
+            # Only re-measure latency to the server already chosen
+            server = self._st.get_best_server([self._server])
+            if self.server_id is None and not is_reachable(server):
+                logging.warning("Server %s stopped responding, choosing another", server['host'])
+                self._forget_best_server()
+                self._server = self._choose_server(get_servers(self._st), use_cache=False)
+                self._tests_since_probe = 0
+            elif (self._best_latency is not None
+                    and server['latency'] > self._best_latency * self.LATENCY_SPIKE):
+                logging.info("Latency to %s rose from %.1f to %.1f ms, re-probing next test",
+                             server['host'], self._best_latency, server['latency'])
+                self._tests_since_probe = self.REPROBE_EVERY
+        
+        return self._st, self._server
+
+    def _choose_server(self, servers: Dict, use_cache: bool) -> Dict:
+        """Pick the test server automatically, reusing a persisted choice if it responds"""
+        if use_cache:
+            server = self._load_best_server(servers)
+            if server is not None:
+                server = self._st.get_best_server([server])
+                if is_reachable(server):
+                    self._best_latency = server['latency']
+                    return server
+                logging.warning("Cached best server %s is not responding, re-probing",
+                                server['host'])
+                self._forget_best_server()
+        
+        # Probe the closest servers in parallel rather than one by one, then
+        # let speedtest-cli measure the winner as the test target. They are
+        # taken from the list in hand, as the reused client's
+        # get_closest_servers() keeps appending to its previous result.
+        closest = closest_servers(servers)
+        fastest = probe_servers(closest)
+        if fastest and is_reachable(fastest[0]):
+            server = self._st.get_best_server(fastest[:1])
+        else:
+            server = self._st.get_best_server(closest)
+        
+        # Only a server that answered is worth remembering across restarts
+        if is_reachable(server):
+            self._save_best_server(server)
+            self._best_latency = server['latency']
+        else:
+            self._best_latency = None
+        return server
 
-    def save_results(self, data: Dict):
-        """Save results in specified formats"""
+    def _load_best_server(self, servers: Dict) -> Optional[Dict]:
+        """Return the persisted best server if it is recent and still listed"""
         try:
-            if 'csv' in self.output_formats:
-                self.save_to_csv(data)
-            if 'json' in self.output_formats:
-                self.save_to_json(data)
+            with open(self.best_server_file, 'r') as f:
+                cached = json.load(f)
+            if time.time() - cached['chosen_at'] > self.BEST_SERVER_TTL:
+                return None
+            return index_servers(servers).get(int(cached['server_id']))
+        except FileNotFoundError:
+            return None
         except Exception as e:
-            logging.error(f"Error saving results: {str(e)}")
+            logging.warning("Ignoring best server cache: %s", e)
+            return None
 
-    def save_to_csv(self, data: Dict):
-        """Save results to CSV file"""
+    def _save_best_server(self, server: Dict):
+        """Persist the chosen server so a restart can skip the probe"""
         try:
-            with open(self.csv_file, 'a', newline='') as f:
-                writer = csv.writer(f)
-                writer.writerow([
-                    data['timestamp'],
-                    data['download_speed'],
-                    data['upload_speed'],
-                    data['ping'],
-                    data['server_host'],
-                    data['server_name'],
-                    data['server_country'],
-                    data['server_sponsor']
-                ])
+            tmp_file = self.best_server_file.with_suffix('.tmp')
+            with open(tmp_file, 'w') as f:
+                json.dump({'server_id': int(server['id']), 'chosen_at': time.time()}, f)
+            os.replace(tmp_file, self.best_server_file)
         except Exception as e:
-            logging.error(f"Error saving to CSV: {str(e)}")
+            logging.warning("Could not save best server: %s", e)
 
-    def save_to_json(self, data: Dict):
-        """Save results to JSON file"""
+    def _forget_best_server(self):
+        """Delete the persisted best server so the next choice is probed afresh"""
         try:
-            # Read existing data
-            if self.json_file.exists():
-                with open(self.json_file, 'r') as f:
-                    json_data = json.load(f)
-            else:
-                json_data = {'speed_tests': []}
+            self.best_server_file.unlink()
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logging.warning("Could not delete best server cache: %s", e)
+
+    def _next_speedtest(self) -> speedtest.Speedtest:
+        """Return the prefetched Speedtest client if there is one, else a new one"""
+        future, self._st_future = self._st_future, None
+        if future is not None:
+            try:
+                return future.result()
+            except Exception as e:
+                logging.warning("Prefetching speedtest config failed: %s", e)
+        return speedtest.Speedtest()
+
+    def _persist(self, current_time: datetime, download_speed: float,
+                 upload_speed: float, ping: float, server: Dict):
+        """Queue results to be saved by the writer thread"""
+        timestamp = (f'{current_time.year:04d}-{current_time.month:02d}-{current_time.day:02d} '
+                     f'{current_time.hour:02d}:{current_time.minute:02d}')
+        self._write_q.put((timestamp, download_speed, upload_speed, ping, server))
+
+    def _run_in_worker(self, fn) -> Future:
+        """Queue a call for the worker thread and return its future"""
+        future = Future()
+        self._work_q.put((future, fn))
+        return future
+
+    def _worker_loop(self):
+        """Run queued calls one at a time until stop() sends None"""
+        while True:
+            item = self._work_q.get()
+            if item is None:
+                return
+            future, fn = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(fn())
+            except BaseException as e:
+                future.set_exception(e)
+
+    def _writer_loop(self):
+        """Save queued results, writing whatever has piled up as one batch"""
+        while True:
+            batch = [self._write_q.get()]
+            while batch[-1] is not None and len(batch) < self.WRITE_BATCH_MAX:
+                try:
+                    batch.append(self._write_q.get_nowait())
+                except queue.Empty:
+                    break
             
-            # Add new data
-            json_data['speed_tests'].append({
-                'timestamp': data['timestamp'],
-                'download_speed': round(data['download_speed'], 2),
-                'upload_speed': round(data['upload_speed'], 2),
-                'ping': round(data['ping'], 1),
+            done = batch[-1] is None
+            if done:
+                batch.pop()
+            if batch:
+                self._write_batch(batch)
+            if done:
+                return
+
+    def _write_batch(self, batch: List[Tuple]):
+        """Save a batch of results in the specified formats"""
+        try:
+            for result in batch:
+                if 'csv' in self.output_formats:
+                    self.save_to_csv(*result)
+                if 'json' in self.output_formats:
+                    self.save_to_json(*result)
+            for fh in (self._csv_fh, self._json_fh):
+                if fh is not None:
+                    fh.flush()
+            self.save_state()
+        except Exception as e:
+            logging.error("Error saving results: %s", e)
+
+    def save_state(self):
+        """Atomically replace the state file with the samples currently plotted"""
+        try:
+            view, _ = self._snapshot()
+            recent = [
+                [float(ts), round(float(dl), 2), round(float(ul), 2), round(float(ping), 1)]
+                for ts, dl, ul, ping in zip(view['ts'], view['dl'], view['ul'], view['ping'])
+            ]
+            tmp_file = self.state_file.with_suffix('.tmp')
+            with open(tmp_file, 'w') as f:
+                json.dump({'recent': recent}, f)
+            os.replace(tmp_file, self.state_file)
+        except Exception as e:
+            logging.error("Error saving state: %s", e)
+
+    def save_to_csv(self, timestamp: str, download_speed: float, upload_speed: float,
+                    ping: float, server: Dict):
+        """Save results to CSV file"""
+        try:
+            esc = self._csv_escape
+            self._csv_fh.write(self._row_fmt.format(
+                ts=timestamp,
+                dl=download_speed,
+                ul=upload_speed,
+                ping=ping,
+                host=server['host'].translate(esc),
+                name=server['name'].translate(esc),
+                country=server['country'].translate(esc),
+                sponsor=server['sponsor'].translate(esc)
+            ))
+        except Exception as e:
+            logging.error("Error saving to CSV: %s", e)
+
+    def save_to_json(self, timestamp: str, download_speed: float, upload_speed: float,
+                     ping: float, server: Dict):
+        """Append results to the JSON Lines file, one record per line"""
+        try:
+            record = {
+                'timestamp': timestamp,
+                'download_speed': download_speed,
+                'upload_speed': upload_speed,
+                'ping': ping,
                 'server': {
-                    'host': data['server_host'],
-                    'name': data['server_name'],
-                    'country': data['server_country'],
-                    'sponsor': data['server_sponsor']
+                    'host': server['host'],
+                    'name': server['name'],
+                    'country': server['country'],
+                    'sponsor': server['sponsor']
                 }
-            })
-            
-            # Write updated data
-            with open(self.json_file, 'w') as f:
-                json.dump(json_data, f, indent=2)
-                
+            }
+            self._json_fh.write(json.dumps(record) + '\n')
+        except Exception as e:
+            logging.error("Error saving to JSON: %s", e)
+
+    def _read_csv_tail(self, chunk_size: int = 64 * 1024) -> List[List[str]]:
+        """Read the last MAX_POINTS rows of the CSV without parsing the whole file"""
+        with open(self.csv_file, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            pos = f.tell()
+            data = b''
+            while pos > 0 and data.count(b'\n') <= self.MAX_POINTS + 1:
+                step = min(chunk_size, pos)
+                pos -= step
+                f.seek(pos)
+                data = f.read(step) + data
+        
+        # The first line is either the header or cut off mid-row
+        lines = data.decode('utf-8', errors='replace').splitlines()[1:]
+        rows = [row for row in csv.reader(lines) if row]
+        return rows[-self.MAX_POINTS:]
+
+    def _load_state(self) -> bool:
+        """Load the last samples from the state file, returning False if unusable"""
+        try:
+            with open(self.state_file, 'r') as f:
+                recent = json.load(f)['recent']
+            samples = [
+                (datetime.fromtimestamp(ts), dl, ul, ping)
+                for ts, dl, ul, ping in recent[-self.MAX_POINTS:]
+            ]
+        except FileNotFoundError:
+            return False
         except Exception as e:
-            logging.error(f"Error saving to JSON: {str(e)}")
+            logging.warning("Ignoring state file, reading the CSV history instead: %s", e)
+            return False
+        for sample in samples:
+            self.add_sample(*sample)
+        return True
 
     def load_existing_data(self):
         """Load existing data with proper error handling"""
         try:
+            if self._load_state():
+                return
             if self.csv_file.exists():
-                df = pd.read_csv(self.csv_file)
-                if not df.empty:
-                    recent_data = df.tail(self.MAX_POINTS)
-                    self.timestamps.extend(pd.to_datetime(recent_data['Timestamp']))
-                    self.download_speeds.extend(recent_data['Download (Mbps)'])
-                    self.upload_speeds.extend(recent_data['Upload (Mbps)'])
-                    self.pings.extend(recent_data['Ping (ms)'])
+                try:
+                    rows = self._read_csv_tail()
+                except Exception as e:
+                    logging.warning("Falling back to a full read of the CSV history: %s", e)
+                    with open(self.csv_file, newline='') as f:
+                        reader = csv.reader(f)
+                        next(reader, None)  # Skip header
+                        rows = deque((row for row in reader if row), maxlen=self.MAX_POINTS)
+                
+                samples = [
+                    (datetime.strptime(row[0], '%Y-%m-%d %H:%M'),
+                     float(row[1]), float(row[2]), float(row[3]))
+                    for row in rows
+                ]
+                for sample in samples:
+                    self.add_sample(*sample)
             else:
                 logging.info("No existing CSV data found.")
         except Exception as e:
-            logging.error(f"Error loading existing data: {str(e)}")
+            logging.error("Error loading existing data: %s", e)
             # Continue with empty data structures
             pass
 
-    def update_plot(self, frame):
+    def add_sample(self, timestamp: datetime, download_speed: float,
+                   upload_speed: float, ping: float):
+        """Append a sample to the ring buffer"""
+        with self._data_lock:
+            idx = self._n % self.MAX_POINTS
+            self._buf[idx] = (timestamp.timestamp(), download_speed, upload_speed, ping,
+                              f'{timestamp.hour:02d}:{timestamp.minute:02d}')
+            for field, value in (('dl', download_speed), ('ul', upload_speed), ('ping', ping)):
+                maxima = self._maxima[field]
+                while maxima and maxima[-1][1] <= value:
+                    maxima.pop()
+                maxima.append((self._n, value))
+                if maxima[0][0] <= self._n - self.MAX_POINTS:
+                    maxima.popleft()
+            self._n += 1
+        self._new_data.set()
+
+    def _snapshot(self):
+        """Return the samples, oldest first, and their maxima, taken under one lock"""
+        with self._data_lock:
+            n = self._n
+            if n <= self.MAX_POINTS:
+                view = self._buf[:n].copy()
+            else:
+                idx = n % self.MAX_POINTS
+                view = np.concatenate((self._buf[idx:], self._buf[:idx]))
+            maxima = {field: float(q[0][1]) if q else 0.0
+                      for field, q in self._maxima.items()}
+        return view, maxima
+
+    def _format_time_tick(self, x, pos) -> str:
+        """Map an x position on the plot to the time of that sample"""
+        i = int(x)
+        if 0 <= i < len(self._plot_labels):
+            return self._plot_labels[i]
+        return ''
+
+    def _rescale_y(self, ax, data_max: float):
+        """Change the y limit only when the data outgrows it or leaves too much slack"""
+        target = data_max * self.Y_HEADROOM
+        _, top = ax.get_ylim()
+        if data_max > top or top > target * (1 + self.Y_SLACK):
+            ax.set_ylim(0, target or 1)
+
+    def update_plot(self, frame=None):
         """Update the plot with new data"""
         try:
+            self._measuring_text.set_visible(not self._first_test_done.is_set())
+            
+            # Nothing to do until a sample arrives that is not plotted yet
+            n = self._n
+            if n == self._plotted_n:
+                return self.line_download, self.line_upload, self.line_ping
+            self._plotted_n = n
+            
             # Update lines data
-            x_data = range(len(self.download_speeds))
-            self.line_download.set_data(x_data, list(self.download_speeds))
-            self.line_upload.set_data(x_data, list(self.upload_speeds))
-            self.line_ping.set_data(x_data, list(self.pings))
+            view, maxima = self._snapshot()
+            k = len(view)
+            x_data = self._xs[:k]
+            dl, ul, png = view['dl'], view['ul'], view['ping']
+            self._plot_labels = view['label']
+            self.line_download.set_data(x_data, dl)
+            self.line_upload.set_data(x_data, ul)
+            self.line_ping.set_data(x_data, png)
             
             # Adjust axes limits
-            if len(self.download_speeds) > 0:
-                self.ax1.set_xlim(0, len(self.download_speeds))
-                max_speed = max(max(self.download_speeds), max(self.upload_speeds))
-                self.ax1.set_ylim(0, max_speed * 1.1)
+            if k > 0:
+                self.ax1.set_xlim(0, k)
+                max_speed = max(maxima['dl'], maxima['ul'])
+                self._rescale_y(self.ax1, max_speed)
                 
-            if len(self.pings) > 0:
-                self.ax2.set_xlim(0, len(self.pings))
-                self.ax2.set_ylim(0, max(self.pings) * 1.1)
-            
-            # Add timestamps as x-axis labels
-            if len(self.timestamps) > 0:
-                self.ax2.set_xticks(range(len(self.timestamps)))
-                self.ax2.set_xticklabels([t.strftime('%H:%M') for t in self.timestamps], rotation=45)
+                self.ax2.set_xlim(0, k)
+                self._rescale_y(self.ax2, maxima['ping'])
             
             return self.line_download, self.line_upload, self.line_ping
         except Exception as e:
-            logging.error(f"Error updating plot: {str(e)}")
+            logging.error("Error updating plot: %s", e)
             return self.line_download, self.line_upload, self.line_ping
 
-    def run_scheduler(self):
-        """Run the scheduler loop"""
-        schedule.every(self.interval_minutes).minutes.do(self.run_speed_test)
-        while self.running:
-            schedule.run_pending()
-            time.sleep(1)
+    def redraw_if_needed(self):
+        """Redraw the plot only when a new sample has arrived"""
+        if not self._new_data.is_set():
+            return
+        self._new_data.clear()
+        self.update_plot()
+        self.fig.canvas.draw_idle()
+
+    def _scheduler_loop(self):
+        """Submit a test every interval, waking only when one is due"""
+        period = self.interval_minutes * 60
+        next_fire = time.monotonic()
+        while True:
+            # Deadlines advance from the previous one so tests do not drift,
+            # but intervals missed while the clock jumped ahead (e.g. across a
+            # suspend) are skipped rather than fired back to back
+            next_fire += period
+            now = time.monotonic()
+            if next_fire < now:
+                next_fire += ((now - next_fire) // period + 1) * period
+            if self._stop.wait(next_fire - now):
+                return
+            self._submit_test()
+
+    def _submit_test(self):
+        """Submit a speed test unless the previous one is still running"""
+        with self._submit_lock:
+            if self._test_future is not None and not self._test_future.done():
+                logging.warning("Previous speed test still running, skipping this one")
+                return None
+            future = self._test_future = self._run_in_worker(self.run_speed_test)
+        future.add_done_callback(self._on_test_done)
+        return future
+
+    def _on_first_test_done(self, future):
+        """Hide the measuring overlay once the first test has finished"""
+        self._first_test_done.set()
+        self._new_data.set()
 
     def start(self):
         """Start the speed test monitor"""
         try:
+            # Run initial test without blocking the plot window; it is submitted
+            # before the scheduler starts so that it cannot be skipped
+            self._submit_test().add_done_callback(self._on_first_test_done)
+            
             # Start the scheduler thread
-            self.scheduler_thread.start()
+            self._scheduler_thread = threading.Thread(target=self._scheduler_loop, daemon=True)
+            self._scheduler_thread.start()
             
-            # Run initial test
-            self.run_speed_test()
+            if not self.enable_plot:
+                # Headless: just keep collecting until stop() is called
+                logging.info("Running without a plot, press Ctrl+C to stop")
+                # Wait in short steps: an untimed wait is not interrupted by
+                # Ctrl+C on Windows
+                while not self._stop.wait(1):
+                    pass
+                return
             
-            # Set up animation
-            ani = FuncAnimation(
-                self.fig,
-                self.update_plot,
-                interval=1000,
-                save_count=self.MAX_POINTS,
-                cache_frame_data=False
-            )
+            # Redraw from the GUI thread, but only when new data has arrived
+            self._redraw_timer = self.fig.canvas.new_timer(interval=self.REDRAW_POLL_MS)
+            self._redraw_timer.add_callback(self.redraw_if_needed)
+            self._redraw_timer.start()
+            self.redraw_if_needed()
             
             # Show plot (this will block until window is closed)
+            import matplotlib.pyplot as plt
             plt.show()
             
+        except KeyboardInterrupt:
+            logging.info("Speed test monitor stopped by user")
         except Exception as e:
-            logging.error(f"Error starting monitor: {str(e)}")
+            logging.error("Error starting monitor: %s", e)
         finally:
             # Clean up when plot is closed
-            self.running = False
-            self.scheduler_thread.join(timeout=1)  # Add timeout to prevent hanging
+            self.stop()
+
+    def stop(self):
+        """Stop the scheduler and flush and close the output files"""
+        self._stop.set()
+        if self._redraw_timer is not None:
+            self._redraw_timer.stop()
+        self._work_q.put(None)
+        
+        # Let the writer thread drain the queue before closing the files
+        self._write_q.put(None)
+        self._writer_thread.join(timeout=5)
+        
+        for fh in (self._csv_fh, self._json_fh):
+            try:
+                if fh is not None and not fh.closed:
+                    fh.flush()
+                    fh.close()
+            except Exception as e:
+                logging.error("Error closing %s: %s", fh.name, e)
+        
+        # Detach the monitor log so a later monitor starts with its own
+        self._log_buffer.flush()
+        logging.getLogger().removeHandler(self._log_buffer)
+        self._log_buffer.close()
+        self._log_file.close()
 
 def main(server_id: Optional[int] = None, interval_minutes: int = 10, 
-         output_formats: List[str] = ['csv', 'json']):
+         output_formats: List[str] = ['csv', 'json'], enable_plot: bool = True):
     try:
-        monitor = SpeedTestMonitor(server_id, interval_minutes, output_formats)
-        logging.info(f"Starting speed test scheduler (Interval: {interval_minutes} minutes)")
+        monitor = SpeedTestMonitor(server_id, interval_minutes, output_formats, enable_plot)
+        logging.info("Starting speed test scheduler (Interval: %s minutes)", interval_minutes)
         monitor.start()
     except Exception as e:
-        logging.error(f"Error in main: {str(e)}")
+        logging.error("Error in main: %s", e)
         sys.exit(1)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main(enable_plot='--no-plot' not in sys.argv[1:])
\ No newline at end of file
@@ -0,0 +1,130 @@
+# speedtest_servers.py
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+if TYPE_CHECKING:
+    import speedtest
+
+# On-disk copy of the last get_servers() result
+SERVER_CACHE_FILE = Path('cache') / 'servers.json'
+SERVER_CACHE_TTL = 24 * 60 * 60  # seconds
+
+# Parallel latency probing of candidate servers
+LATENCY_PROBES = 3
+CLOSEST_SERVERS = 5
+MAX_PROBE_WORKERS = 8
+UNREACHABLE_LATENCY = 3600 * 1000  # ms
+# get_best_server() averages 3 probes over 6, so a single failed probe adds
+# at least this much to the latency it reports
+FAILED_PROBE_LATENCY = UNREACHABLE_LATENCY / 6
+
+
+def index_servers(servers: Dict[float, List[Dict]]) -> Dict[int, Dict]:
+    """Flatten the distance-keyed result of get_servers() into an id -> server dict"""
+    return {int(s['id']): s for sl in servers.values() for s in sl}
+
+
+def closest_servers(servers: Dict[float, List[Dict]], limit: int = CLOSEST_SERVERS) -> List[Dict]:
+    """Return the servers nearest by distance from the result of get_servers()"""
+    return [s for d in sorted(servers) for s in servers[d]][:limit]
+
+
+def is_reachable(server: Dict) -> bool:
+    """Whether every latency probe to a server succeeded"""
+    return server.get('latency', UNREACHABLE_LATENCY) < FAILED_PROBE_LATENCY
+
+
+def server_cache_age() -> Optional[float]:
+    """Return the age of the server cache in seconds, or None if there is none"""
+    try:
+        return time.time() - SERVER_CACHE_FILE.stat().st_mtime
+    except OSError:
+        return None
+
+
+def load_cached_servers(max_age: Optional[float] = SERVER_CACHE_TTL) -> Optional[Dict]:
+    """Load the cached server list, or None if missing or older than max_age seconds"""
+    age = server_cache_age()
+    if age is None or (max_age is not None and age > max_age):
+        return None
+    try:
+        with open(SERVER_CACHE_FILE, 'r') as f:
+            servers = json.load(f)
+    except Exception:
+        return None
+    # JSON turns the distance keys into strings; get_closest_servers() sorts them
+    return {float(d): sl for d, sl in servers.items()}
+
+
+def save_cached_servers(servers: Dict):
+    """Atomically replace the server cache"""
+    SERVER_CACHE_FILE.parent.mkdir(exist_ok=True)
+    tmp_file = SERVER_CACHE_FILE.with_suffix('.tmp')
+    with open(tmp_file, 'w') as f:
+        json.dump(servers, f)
+    os.replace(tmp_file, SERVER_CACHE_FILE)
+
+
+def fetch_servers(st: Optional['speedtest.Speedtest'] = None) -> Dict:
+    """Download the server list and refresh the cache"""
+    if st is None:
+        # Imported here so that cache-only callers never load speedtest-cli
+        import speedtest
+
+        st = speedtest.Speedtest()
+    servers = st.get_servers()
+    save_cached_servers(servers)
+    return servers
+
+
+def get_servers(st: Optional['speedtest.Speedtest'] = None,
+                max_age: Optional[float] = SERVER_CACHE_TTL) -> Dict:
+    """Return the server list from the cache if fresh, otherwise from the network"""
+    servers = load_cached_servers(max_age)
+    if servers is None:
+        return fetch_servers(st)
+    if st is not None:
+        # Let get_best_server() pick from the cached list too
+        st.servers = servers
+    return servers
+
+
+def probe_latency(server: Dict, opener=None, timeout: float = 10) -> float:
+    """Measure the average latency to a server in ms over LATENCY_PROBES requests"""
+    import speedtest
+
+    if opener is None:
+        opener = speedtest.build_opener(timeout=timeout)
+    url = f"{os.path.dirname(server['url'])}/latency.txt"
+    samples = []
+    for i in range(LATENCY_PROBES):
+        # speedtest-cli's request and opener carry its cache buster, User-Agent
+        # and source address binding
+        request = speedtest.build_request(url, bump=str(i))
+        start = time.perf_counter()
+        try:
+            with opener.open(request, timeout=timeout) as r:
+                ok = r.status == 200 and r.read(9) == b'test=test'
+        except Exception:
+            ok = False
+        samples.append((time.perf_counter() - start) * 1000 if ok else UNREACHABLE_LATENCY)
+    return round(sum(samples) / len(samples), 3)
+
+
+def probe_servers(servers: List[Dict], max_workers: int = MAX_PROBE_WORKERS,
+                  source_address: Optional[str] = None, timeout: float = 10) -> List[Dict]:
+    """Probe servers in parallel, store their 'latency' and return them fastest first"""
+    if not servers:
+        return []
+    import speedtest
+
+    opener = speedtest.build_opener(source_address, timeout)
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(servers))) as pool:
+        latencies = pool.map(lambda s: probe_latency(s, opener, timeout), servers)
+        for server, latency in zip(servers, latencies):
+            server['latency'] = latency
+    return sorted(servers, key=lambda s: s['latency'])